@@ -1,10 +1,16 @@
 """Module to process email attachments and search for student information."""
 
+import io
 import os
-import tempfile
+import re
 import logging
-from typing import List, Dict, Any, Optional
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Set
 import pandas as pd
+from openpyxl import load_workbook
 from imap_tools import MailMessage
 
 # Configure logging
@@ -18,6 +24,59 @@ SEARCH_TERMS = [
     "22BCE1385"  # Sometimes written differently
 ]
 
+# Lowercased, de-duplicated search terms mapped back to their display form
+_TERMS_BY_LOWER = {term.lower(): term for term in SEARCH_TERMS}
+
+# One pass over the text finds every term: the lookahead lets matches
+# overlap, and longer terms are tried first at each position
+_TERMS_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(t) for t in sorted(_TERMS_BY_LOWER, key=len, reverse=True)) + '))'
+)
+
+# A match for a longer term also implies every term it contains
+# (e.g. "akkilesh a" implies "akkilesh")
+_IMPLIED_TERMS = {
+    term: [other for other in _TERMS_BY_LOWER if other in term]
+    for term in _TERMS_BY_LOWER
+}
+
+# Largest attachment payload, and largest unzipped workbook, that will be parsed
+MAX_ATTACHMENT_BYTES = 25 * 1024 * 1024
+MAX_UNCOMPRESSED_BYTES = 200 * 1024 * 1024
+
+# File extensions treated as Excel attachments
+EXCEL_EXTENSIONS = frozenset({'.xlsx', '.xls', '.xlsm', '.xlsb'})
+
+# Content types used for Excel files. Many mail clients send the generic
+# application/octet-stream, so that is accepted and left to the other checks.
+EXCEL_CONTENT_TYPES = frozenset({
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel',
+    'application/vnd.ms-excel.sheet.macroenabled.12',
+    'application/vnd.ms-excel.sheet.binary.macroenabled.12',
+    'application/octet-stream',
+})
+
+# File signatures: .xlsx/.xlsm/.xlsb are ZIP archives, .xls is an OLE2 file
+_ZIP_SIGNATURE = b'PK\x03\x04'
+_OLE2_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+def _create_pool() -> ProcessPoolExecutor:
+    """
+    Create the worker pool for parsing several Excel attachments at once.
+    Workbook parsing is CPU-bound, so processes sidestep the GIL; workers are
+    spawned on first use rather than forked from the threaded server process.
+    """
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+
+# Shared worker pool, replaced if a worker dies (e.g. out of memory on a huge workbook)
+_POOL = _create_pool()
+
 def process_excel_attachments(msg: MailMessage) -> Dict[str, Any]:
     """
     Process Excel attachments from an email message and search for student information.
@@ -46,22 +105,52 @@ def process_excel_attachments(msg: MailMessage) -> Dict[str, Any]:
             
         result['has_attachments'] = True
         
+        excel_files = []
         for attachment in attachments:
             filename = attachment.filename or "unknown"
             logger.info(f"Processing attachment: {filename}")
             
             # Check if it's an Excel file
-            if _is_excel_file(filename):
-                result['excel_attachments'] += 1
-                
-                # Process the Excel file
-                found_info = _search_excel_content(attachment.payload, filename)
-                if found_info['found']:
-                    result['name_found'] = True
-                    result['found_in_files'].append({
-                        'filename': filename,
-                        'matches': found_info['matches']
-                    })
+            if not _is_excel_file(filename):
+                continue
+            
+            # Reject mislabeled or oversized files before handing them to a parser
+            payload = attachment.payload
+            rejection = _check_excel_payload(payload, attachment.content_type)
+            if rejection:
+                logger.warning(f"Skipping attachment {filename}: {rejection}")
+                continue
+            
+            excel_files.append((payload, filename))
+        
+        result['excel_attachments'] = len(excel_files)
+        
+        # Lowercased search terms not yet found in any attachment
+        remaining_terms = set(_TERMS_BY_LOWER)
+        
+        # Process the Excel files, in parallel when there is more than one
+        if len(excel_files) > 1:
+            found_infos = _search_excel_files_in_pool(excel_files, remaining_terms)
+        else:
+            found_infos = (
+                _search_excel_content(payload, filename, remaining_terms)
+                for payload, filename in excel_files
+            )
+        
+        for (_, filename), found_info in zip(excel_files, found_infos):
+            if found_info['found']:
+                result['name_found'] = True
+                result['found_in_files'].append({
+                    'filename': filename,
+                    'matches': found_info['matches']
+                })
+                for match in found_info['matches']:
+                    remaining_terms.difference_update(term.lower() for term in match['terms_found'])
+            
+            if not remaining_terms:
+                # Everything has been found; skip the remaining attachments
+                found_infos.close()
+                break
                     
     except Exception as e:
         logger.error(f"Error processing attachments: {type(e).__name__} - {e}")
@@ -69,21 +158,102 @@ def process_excel_attachments(msg: MailMessage) -> Dict[str, Any]:
     
     return result
 
+def _search_excel_files_in_pool(
+    excel_files: List[Tuple[bytes, str]],
+    remaining_terms: Set[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Search Excel files in the worker pool, yielding the results in order.
+    
+    If a worker dies, the broken pool is replaced for later emails and the
+    files without a result yet are searched in this process instead.
+    Closing the generator cancels the searches that have not started.
+    
+    Args:
+        excel_files: (payload, filename) tuples of the files to search
+        remaining_terms: Lowercased search terms not yet found, used for
+            the files searched in this process
+    """
+    global _POOL
+    
+    pool = _POOL
+    futures = []
+    searched = 0
+    try:
+        futures = [
+            pool.submit(_search_excel_content, payload, filename)
+            for payload, filename in excel_files
+        ]
+        for future in futures:
+            yield future.result()
+            searched += 1
+    except BrokenProcessPool:
+        logger.warning("Attachment worker pool broke, restarting it and searching the remaining files inline")
+        pool.shutdown(wait=False, cancel_futures=True)
+        if _POOL is pool:
+            _POOL = _create_pool()
+        for payload, filename in excel_files[searched:]:
+            yield _search_excel_content(payload, filename, remaining_terms)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
 def _is_excel_file(filename: str) -> bool:
     """Check if filename indicates an Excel file."""
     if not filename:
         return False
     
-    excel_extensions = ['.xlsx', '.xls', '.xlsm', '.xlsb']
-    return any(filename.lower().endswith(ext) for ext in excel_extensions)
+    return os.path.splitext(filename)[1].lower() in EXCEL_EXTENSIONS
 
-def _search_excel_content(file_content: bytes, filename: str) -> Dict[str, Any]:
+def _check_excel_payload(payload: bytes, content_type: str) -> Optional[str]:
+    """
+    Check that an attachment looks like a workbook that is safe to parse.
+    
+    Args:
+        payload: Binary content of the attachment
+        content_type: MIME type declared for the attachment
+    
+    Returns:
+        Reason for rejecting the attachment, or None if it can be parsed
+    """
+    if content_type not in EXCEL_CONTENT_TYPES:
+        return f"unexpected content type {content_type}"
+    
+    if len(payload) > MAX_ATTACHMENT_BYTES:
+        return f"{len(payload)} bytes exceeds the {MAX_ATTACHMENT_BYTES} byte limit"
+    
+    if payload.startswith(_ZIP_SIGNATURE):
+        # Only the central directory is read, so this is cheap even for zip bombs
+        try:
+            with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+                uncompressed = sum(info.file_size for info in archive.infolist())
+        except zipfile.BadZipFile:
+            return "corrupt ZIP archive"
+        if uncompressed > MAX_UNCOMPRESSED_BYTES:
+            return f"unzips to {uncompressed} bytes, over the {MAX_UNCOMPRESSED_BYTES} byte limit"
+        return None
+    
+    if payload.startswith(_OLE2_SIGNATURE):
+        return None
+    
+    return "content is not an Excel workbook"
+
+def _search_excel_content(
+    file_content: bytes, 
+    filename: str, 
+    terms: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
     """
     Search Excel file content for student information.
     
+    Each term is reported for the first sheet it is found in, and reading
+    stops once every term has been found.
+    
     Args:
         file_content: Binary content of the Excel file
         filename: Name of the file for logging
+        terms: Lowercased search terms to look for (defaults to all SEARCH_TERMS)
     
     Returns:
         Dictionary with search results
@@ -92,64 +262,128 @@ def _search_excel_content(file_content: bytes, filename: str) -> Dict[str, Any]:
         'found': False,
         'matches': []
     }
+    remaining_terms = set(_TERMS_BY_LOWER if terms is None else terms)
     
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as temp_file:
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
         try:
-            # Try to read the Excel file
-            if filename.lower().endswith('.xlsx') or filename.lower().endswith('.xlsm'):
-                # Use openpyxl engine for .xlsx files
-                df = pd.read_excel(temp_file_path, engine='openpyxl', sheet_name=None)
-            else:
-                # Use xlrd for .xls files
-                df = pd.read_excel(temp_file_path, engine='xlrd', sheet_name=None)
-            
-            # Search through all sheets
-            for sheet_name, sheet_data in df.items():
-                logger.info(f"Searching sheet '{sheet_name}' in {filename}")
-                
-                # Convert all data to string and search
-                sheet_text = sheet_data.astype(str).values.flatten()
-                sheet_text_combined = ' '.join(sheet_text).lower()
-                
-                # Search for each term
-                found_terms = []
-                for term in SEARCH_TERMS:
-                    if term.lower() in sheet_text_combined:
-                        found_terms.append(term)
-                        result['found'] = True
-                
+            for sheet_name, found_terms in _scan_sheets(file_content, filename, remaining_terms):
                 if found_terms:
+                    result['found'] = True
                     result['matches'].append({
                         'sheet': sheet_name,
                         'terms_found': found_terms
                     })
+                    remaining_terms.difference_update(term.lower() for term in found_terms)
+                
+                if not remaining_terms:
+                    break
                     
         except Exception as e:
             logger.error(f"Error reading Excel file {filename}: {type(e).__name__} - {e}")
             # Try with different engines as fallback
             try:
-                df = pd.read_excel(temp_file_path, sheet_name=None)
+                df = pd.read_excel(io.BytesIO(file_content), sheet_name=None)
                 # Repeat search logic here if needed
             except:
                 logger.error(f"Failed to read {filename} with any method")
-        
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
                 
     except Exception as e:
         logger.error(f"Error in Excel search for {filename}: {type(e).__name__} - {e}")
     
     return result
 
+def _scan_sheets(
+    file_content: bytes, 
+    filename: str, 
+    terms: Set[str]
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Yield the search terms found in each sheet of an Excel file.
+    
+    .xlsx/.xlsm workbooks are streamed row by row with openpyxl in read-only
+    mode, so no DataFrame is built for a sheet we only substring-match.
+    Legacy .xls files still go through pandas/xlrd, but are searched the
+    same way, cell by cell, and each sheet is only parsed when reached.
+    
+    Args:
+        file_content: Binary content of the Excel file
+        filename: Name of the file, used to pick the reader
+        terms: Lowercased search terms to look for; read again for each
+            sheet, so the caller may drop terms between sheets
+    
+    Yields:
+        Tuples of (sheet name, list of search terms found in that sheet)
+    """
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        workbook = load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                logger.info(f"Searching sheet '{worksheet.title}' in {filename}")
+                yield worksheet.title, _search_rows(worksheet.iter_rows(values_only=True), terms)
+        finally:
+            # Read-only workbooks keep the underlying archive open until closed
+            workbook.close()
+    else:
+        # Use xlrd for .xls files, parsing each sheet only when it is reached
+        with pd.ExcelFile(io.BytesIO(file_content), engine='xlrd') as workbook:
+            for sheet_name in workbook.sheet_names:
+                logger.info(f"Searching sheet '{sheet_name}' in {filename}")
+                
+                # header=None so the first row is searched too
+                sheet_data = workbook.parse(sheet_name, header=None)
+                
+                # Match cell by cell over a flat view of the raw values instead of
+                # building a string copy of the sheet and joining it into one string
+                cells = sheet_data.to_numpy().ravel()
+                yield sheet_name, _search_rows([cells], terms)
+
+def _search_rows(rows: Iterable[Iterable[Any]], terms: Iterable[str]) -> List[str]:
+    """
+    Search rows of cell values for student information, cell by cell.
+    
+    Stops reading rows as soon as every search term has been found.
+    
+    Args:
+        rows: Iterable of rows, each an iterable of raw cell values
+        terms: Lowercased search terms to look for
+    
+    Returns:
+        List of search terms found, in the order they were first seen
+    """
+    terms = set(terms)
+    remaining = {t: term for t, term in _TERMS_BY_LOWER.items() if t in terms}
+    found_terms = []
+    
+    for cell_text in _iter_cell_text(rows):
+        cell_terms = _find_terms(cell_text)
+        for term_lower in [t for t in remaining if t in cell_terms]:
+            found_terms.append(remaining.pop(term_lower))
+        
+        if not remaining:
+            break
+    
+    return found_terms
+
+def _iter_cell_text(rows: Iterable[Iterable[Any]]) -> Iterator[str]:
+    """
+    Lazily yield the lowercased text of each non-empty cell.
+    
+    Cells are converted one at a time as the search consumes them, so
+    memory stays flat however large the sheet is, and cells after an
+    early exit are never converted at all.
+    """
+    for row in rows:
+        for cell in row:
+            if cell is not None:
+                yield str(cell).lower()
+
+def _find_terms(text: str) -> Set[str]:
+    """Return the lowercased search terms that occur in already-lowercased text."""
+    found = set()
+    for match in _TERMS_PATTERN.finditer(text):
+        found.update(_IMPLIED_TERMS[match.group(1)])
+    return found
+
 def format_attachment_summary(attachment_result: Dict[str, Any]) -> Optional[str]:
     """
     Format attachment analysis results for WhatsApp notification.
@@ -1,12 +1,15 @@
 """Loads configuration from .env and keywords.yaml."""
 
 from pathlib import Path
+import logging
 import os
 import yaml
 from dotenv import load_dotenv
 
 load_dotenv()  # Load .env into environment variables
 
+logger = logging.getLogger(__name__)
+
 
 def get_env_var(key: str) -> str:
     """
@@ -15,11 +18,23 @@ def get_env_var(key: str) -> str:
     value = os.getenv(key)
     if not value:
         raise EnvironmentError(f"❌ Required environment variable '{key}' is missing.")
-    else:
-        print(f"✅ Loaded environment variable: {key}")
     return value
 
 
+def get_positive_float_env_var(key: str, default: str) -> float:
+    """
+    Get an optional numeric environment variable and raise an error unless it is positive.
+    """
+    value = os.getenv(key, default)
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not number > 0:
+        raise EnvironmentError(f"❌ Environment variable '{key}' must be a positive number, got '{value}'.")
+    return number
+
+
 # Email credentials
 EMAIL_USER = get_env_var("EMAIL_USER")
 EMAIL_PASSWORD = get_env_var("EMAIL_PASSWORD")
@@ -31,6 +46,10 @@ TWILIO_AUTH_TOKEN = get_env_var("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = get_env_var("TWILIO_PHONE_NUMBER")
 TO_WHATSAPP = get_env_var("MY_PHONE_NUMBER")
 
+# Messages per second the notifier paces itself to; Twilio caps WhatsApp
+# text at 25 MPS, so keep some headroom (use 1.5 for media messages)
+TWILIO_MPS = get_positive_float_env_var("TWILIO_MPS", "20")
+
 # WhatsApp template SID
 WHATSAPP_TEMPLATE_SID = os.getenv(
     "WHATSAPP_TEMPLATE_SID", "HXb5b62575e6e4ff6129ad7c8efe1f983e"
@@ -39,6 +58,15 @@ WHATSAPP_TEMPLATE_SID = os.getenv(
 # Google Gemini credentials
 GEMINI_API_KEY = get_env_var("GEMINI_API_KEY")
 
+# Directory for the persistent LLM result cache (optional). Unset or empty
+# keeps cached results in memory only; relative paths are resolved from
+# the project root
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")
+if LLM_CACHE_DIR:
+    LLM_CACHE_DIR = str(Path(__file__).parent.parent / LLM_CACHE_DIR)
+
+logger.debug("✅ Loaded required environment variables")
+
 
 def load_keywords() -> list[str]:
     """Loads placement keywords from config/keywords.yaml."""
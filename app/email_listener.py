@@ -1,64 +1,224 @@
 """Module to handle IMAP polling and placement email detection."""
 
+import asyncio
+import imaplib
+from typing import Any, Dict, List, Optional, Tuple
+from imap_tools.errors import ImapToolsError
 from imap_tools.mailbox import MailBox
+from imap_tools.message import MailMessage
 from imap_tools.query import AND
 from app.config import EMAIL_USER, EMAIL_PASSWORD, EMAIL_HOST
-from app.filters import analyze_placement_email
-from app.notifier.whatsapp import send_whatsapp_placement_alert
+from app.filters import analyze_placement_emails_async, is_placement_candidate
+from app.notifier.whatsapp import send_whatsapp_placement_alert_async
 from app.attachment_processor import process_excel_attachments, format_attachment_summary
 
 
-def check_for_new_emails():
+# Errors that mean the IMAP connection is unusable and must be re-established
+_CONNECTION_ERRORS = (OSError, imaplib.IMAP4.error, ImapToolsError)
+
+# Long-lived IMAP connection, reused across poll cycles
+_MAILBOX: Optional[MailBox] = None
+
+# RFC 2177 asks clients to re-issue IDLE at least every 29 minutes
+IDLE_TIMEOUT = 29 * 60
+
+
+def _get_mailbox() -> MailBox:
+    """Return the persistent mailbox connection, logging in if there is none."""
+    global _MAILBOX
+    
+    if _MAILBOX is None:
+        _MAILBOX = MailBox(EMAIL_HOST).login(
+            EMAIL_USER, EMAIL_PASSWORD, initial_folder="INBOX"
+        )
+        print("📬 Connected to mailbox")
+    return _MAILBOX
+
+
+def close_mailbox() -> None:
+    """
+    Close the persistent mailbox connection, if one is open.
+    The socket is shut down rather than sending LOGOUT, so this also
+    wakes up a thread blocked in IMAP IDLE on the connection.
+    """
+    global _MAILBOX
+    
+    if _MAILBOX is not None:
+        try:
+            _MAILBOX.client.shutdown()
+        except Exception:
+            pass  # Connection is being discarded anyway
+        _MAILBOX = None
+
+
+def wait_for_new_emails(timeout: float = IDLE_TIMEOUT) -> bool:
+    """
+    Block in IMAP IDLE until the server reports a mailbox change or the timeout expires.
+    Returns at once if a change was already reported during the last check.
+    
+    Args:
+        timeout: Maximum number of seconds to wait
+    
+    Returns:
+        True if IDLE was used, False if the server does not support it or
+        the connection failed, in which case the caller should poll instead
+    """
+    try:
+        mailbox = _get_mailbox()
+        if 'IDLE' not in mailbox.client.capabilities:
+            return False
+        
+        # New mail reported during earlier commands (e.g. the body FETCH or the
+        # \Seen STORE) is queued by imaplib and would not be repeated in IDLE
+        pending = [
+            mailbox.client.untagged_responses.pop(name, None) for name in ('EXISTS', 'RECENT')
+        ]
+        if any(pending):
+            print("📨 Mailbox changed since the last check")
+            return True
+        
+        responses = mailbox.idle.wait(timeout=timeout)
+        if responses:
+            print(f"📨 Mailbox changed: {b', '.join(responses).decode(errors='replace')}")
+        return True
+    except _CONNECTION_ERRORS as e:
+        print(f"🔌 IDLE failed ({type(e).__name__} - {e}), will reconnect on next check")
+        close_mailbox()
+        return False
+
+
+def _fetch_unseen_headers(mailbox: MailBox) -> List[MailMessage]:
+    """Fetch only the headers of the newest unseen emails, in a single command."""
+    return list(mailbox.fetch(
+        AND(seen=False), limit=10, reverse=True, headers_only=True, bulk=True
+    ))
+
+
+def _fetch_unseen_emails() -> Tuple[MailBox, List[MailMessage]]:
+    """
+    Fetch unseen email headers over the persistent connection.
+    Reconnects and retries once if the connection has dropped.
     """
-    Connect to the mailbox and check for new placement-related emails.
+    try:
+        mailbox = _get_mailbox()
+        mailbox.client.noop()  # Keep the connection alive and detect drops early
+        return mailbox, _fetch_unseen_headers(mailbox)
+    except _CONNECTION_ERRORS as e:
+        print(f"🔌 Mailbox connection lost ({type(e).__name__} - {e}), reconnecting...")
+        close_mailbox()
+        mailbox = _get_mailbox()
+        return mailbox, _fetch_unseen_headers(mailbox)
+
+
+def _fetch_placement_candidates() -> Tuple[MailBox, List[MailMessage], List[Tuple[str, str, str]]]:
+    """
+    Fetch unseen emails that pass the placement pre-filter, with their bodies.
+    
+    Returns:
+        Tuple of the mailbox, the fetched messages and their
+        (subject, sender, body) tuples, in the same order
+    """
+    mailbox, headers = _fetch_unseen_emails()
+    
+    # Only download and decode full bodies for likely placement emails
+    candidate_uids = []
+    for msg in headers:
+        subject = msg.subject or ""
+        sender = msg.from_ or ""
+        print(f"📩 New email from: {sender}, Subject: {subject}")
+        if msg.uid and is_placement_candidate(subject, sender):
+            candidate_uids.append(msg.uid)
+    
+    messages = []
+    if candidate_uids:
+        messages = list(mailbox.fetch(AND(uid=candidate_uids), bulk=True))
+    
+    emails = []
+    for msg in messages:
+        subject = msg.subject or ""
+        sender = msg.from_ or ""
+        body = msg.text or msg.html or ""  # Get email body for LLM analysis
+        emails.append((subject, sender, body))
+    
+    return mailbox, messages, emails
+
+
+def _prepare_placement_alerts(
+    messages: List[MailMessage],
+    emails: List[Tuple[str, str, str]],
+    analyses: List[Dict[str, Any]]
+) -> Tuple[List[MailMessage], List[Dict[str, Any]]]:
+    """
+    Collect the WhatsApp alert details for each placement email,
+    including the summary of its Excel attachments.
+    
+    Returns:
+        Tuple of the placement messages and the keyword arguments for
+        their alerts, in the same order
+    """
+    placement_messages = []
+    alerts = []
+    
+    for msg, (subject, _, _), analysis in zip(messages, emails, analyses):
+        if analysis.get('is_placement_related', False):
+            # Process attachments for Excel files
+            print("🔍 Checking attachments for student information...")
+            attachment_result = process_excel_attachments(msg)
+            attachment_summary = format_attachment_summary(attachment_result)
+            
+            # Extract information from LLM analysis
+            placement_messages.append(msg)
+            alerts.append({
+                'subject': subject,
+                'company': analysis.get('company', 'Unknown'),
+                'role': analysis.get('role', 'Position'),
+                'deadline': analysis.get('deadline'),
+                'salary': analysis.get('salary'),
+                'location': analysis.get('location'),
+                'job_type': analysis.get('type'),
+                'requirements': analysis.get('requirements'),
+                'description': analysis.get('description'),
+                'attachment_info': attachment_summary,
+            })
+    
+    return placement_messages, alerts
+
+
+def _mark_as_read(mailbox: MailBox, messages: List[MailMessage]) -> None:
+    """Flag the given messages as seen."""
+    uids = [msg.uid for msg in messages if msg.uid]
+    if uids:
+        mailbox.flag(uids, "\\Seen", True)
+
+
+async def check_for_new_emails():
+    """
+    Check the mailbox for new placement-related emails.
     Triggers a WhatsApp alert with subject and dummy company/role (for now).
+    Blocking IMAP and attachment work runs in a worker thread, while the
+    LLM analysis and the alerts are awaited on the event loop.
     """
     try:
         print(f"✅ EMAIL_USER loaded: {EMAIL_USER}")
 
-        with MailBox(EMAIL_HOST).login(
-            EMAIL_USER, EMAIL_PASSWORD, initial_folder="INBOX"
-        ) as mailbox:
-            for msg in mailbox.fetch(AND(seen=False), limit=10, reverse=True):
-                subject = msg.subject or ""
-                sender = msg.from_ or ""
-                body = msg.text or msg.html or ""  # Get email body for LLM analysis
-                print(f"📩 New email from: {sender}, Subject: {subject}")
-
-                # Analyze email for placement information
-                analysis = analyze_placement_email(subject, sender, body)
-                
-                if analysis.get('is_placement_related', False):
-                    # Extract information from LLM analysis
-                    company = analysis.get('company', 'Unknown')
-                    role = analysis.get('role', 'Position')
-                    deadline = analysis.get('deadline')
-                    salary = analysis.get('salary')
-                    location = analysis.get('location')
-                    job_type = analysis.get('type')
-                    requirements = analysis.get('requirements')
-                    description = analysis.get('description')
-                    
-                    # Process attachments for Excel files
-                    print("🔍 Checking attachments for student information...")
-                    attachment_result = process_excel_attachments(msg)
-                    attachment_summary = format_attachment_summary(attachment_result)
-                    
-                    send_whatsapp_placement_alert(
-                        subject=subject, 
-                        company=company, 
-                        role=role,
-                        deadline=deadline,
-                        salary=salary,
-                        location=location,
-                        job_type=job_type,
-                        requirements=requirements,
-                        description=description,
-                        attachment_info=attachment_summary
-                    )
-                    print("✅ Placement alert triggered!")
-                    if msg.uid:
-                        mailbox.flag(msg.uid, "\\Seen", True)  # Mark as read
+        mailbox, messages, emails = await asyncio.to_thread(_fetch_placement_candidates)
+        
+        # Analyze all new emails for placement information in one batch
+        analyses = await analyze_placement_emails_async(emails)
+        
+        placement_messages, alerts = await asyncio.to_thread(
+            _prepare_placement_alerts, messages, emails, analyses
+        )
+        
+        # Send all alerts concurrently; each send reports its own failures
+        await asyncio.gather(
+            *(send_whatsapp_placement_alert_async(**alert) for alert in alerts),
+            return_exceptions=True
+        )
+        if alerts:
+            print(f"✅ {len(alerts)} placement alert(s) triggered!")
+        
+        await asyncio.to_thread(_mark_as_read, mailbox, placement_messages)
 
     except Exception as e:
         print(f"❌ Error while checking emails: {type(e).__name__} - {e}")
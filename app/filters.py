@@ -1,18 +1,52 @@
 """Filters to check if an email matches placement criteria."""
 
+import asyncio
 import logging
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Tuple
 from app.config import KEYWORDS
-from app.llm_filter import analyze_placement_email_llm, is_placement_related_llm
+from app.llm_filter import analyze_placement_emails_llm_async, is_placement_related_llm
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+# Broad terms that make an email worth an LLM look even when no
+# configured keyword or placement sender matches
+CANDIDATE_INDICATORS = [
+    "placement", "recruit", "hiring", "career", "job", "intern",
+    "interview", "offer", "campus", "drive"
+]
+
+# Sender substrings that indicate a placement email with high confidence
+SENDER_INDICATORS = ["placements", "cdc", "recruitment", "hr", "careers"]
+
+# Role names extracted from the subject, in priority order
+ROLE_KEYWORDS = ["engineer", "developer", "analyst", "intern", "manager", "associate"]
+
+
+def _compile_alternation(terms: list[str]) -> re.Pattern:
+    """Compile terms into one regex matching any of them, lowercased, as a substring."""
+    if not terms:
+        return re.compile(r'(?!)')  # Matches nothing, like an empty keyword list
+    return re.compile('|'.join(re.escape(term.lower()) for term in terms))
+
+
+# Matchers compiled once at import so each check is a single regex scan of
+# the lowercased text instead of a Python-level loop over every term
+_KEYWORDS_RE = _compile_alternation(KEYWORDS)
+_SENDER_RE = _compile_alternation(SENDER_INDICATORS)
+_CANDIDATE_RE = _compile_alternation(CANDIDATE_INDICATORS)
+
+
 def analyze_placement_email(subject: str, sender: str, body: str = "") -> Dict[str, Any]:
     """
     Analyze email for placement information using LLM.
+    Emails with no placement indicators in the subject or sender are
+    rejected by keyword analysis without calling the LLM.
     Falls back to keyword-based analysis if LLM fails.
+    Blocking wrapper around analyze_placement_emails_async for legacy
+    callers; it must not be called from a running event loop.
     
     Args:
         subject: Email subject line
@@ -22,17 +56,62 @@ def analyze_placement_email(subject: str, sender: str, body: str = "") -> Dict[s
     Returns:
         Dictionary containing placement analysis and extracted information
     """
+    return asyncio.run(analyze_placement_emails_async([(subject, sender, body)]))[0]
+
+
+async def analyze_placement_emails_async(emails: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """
+    Analyze several emails for placement information.
+    All emails passing the keyword pre-filter are sent to the LLM together
+    in a single request, which is awaited instead of blocking a thread.
+    
+    Args:
+        emails: List of (subject, sender, body) tuples
+    
+    Returns:
+        List of analysis dictionaries, in the same order as emails
+    """
+    results, candidates = _prefilter_emails(emails)
+    if not candidates:
+        return results
+    
     try:
-        # Use LLM-based analysis as primary method
-        logger.info(f"Analyzing email with LLM - Subject: '{subject[:50]}...', Sender: '{sender}'")
-        return analyze_placement_email_llm(subject, sender, body)
+        # Use LLM-based analysis for likely placement emails
+        llm_results = await analyze_placement_emails_llm_async([emails[index] for index in candidates])
+        for index, llm_result in zip(candidates, llm_results):
+            results[index] = llm_result
         
     except Exception as e:
         logger.error(f"LLM analysis failed: {type(e).__name__} - {e}")
         logger.info("Falling back to keyword-based analysis")
+    
+    return results
+
+
+def _prefilter_emails(emails: List[Tuple[str, str, str]]) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Run keyword analysis on every email and pick out the ones worth an LLM look.
+    
+    Args:
+        emails: List of (subject, sender, body) tuples
+    
+    Returns:
+        Tuple of keyword analyses for all emails and the indices of the
+        emails that passed the pre-filter
+    """
+    results = []
+    candidates = []
+    
+    for index, (subject, sender, _) in enumerate(emails):
+        results.append(_fallback_analysis_keywords(subject, sender))
         
-        # Fallback to keyword-based analysis
-        return _fallback_analysis_keywords(subject, sender)
+        if is_placement_candidate(subject, sender):
+            logger.info(f"Analyzing email with LLM - Subject: '{subject[:50]}...', Sender: '{sender}'")
+            candidates.append(index)
+        else:
+            logger.info(f"Skipping LLM, no placement indicators - Subject: '{subject[:50]}...', Sender: '{sender}'")
+    
+    return results, candidates
 
 
 def is_placement_related(subject: str, sender: str, body: str = "") -> bool:
@@ -52,10 +131,31 @@ def is_placement_related(subject: str, sender: str, body: str = "") -> bool:
     return result.get('is_placement_related', False)
 
 
+def is_placement_candidate(subject: str, sender: str) -> bool:
+    """
+    Cheap pre-filter deciding whether an email deserves a full LLM analysis.
+    Only the subject and sender are needed, so callers can skip fetching
+    the body of emails that are rejected.
+    
+    Args:
+        subject: Email subject line
+        sender: Email sender address
+    
+    Returns:
+        True if the email may be placement-related, False otherwise
+    """
+    subject_lower = subject.lower()
+    return bool(
+        _SENDER_RE.search(sender.lower())
+        or _KEYWORDS_RE.search(subject_lower)
+        or _CANDIDATE_RE.search(subject_lower)
+    )
+
+
 def _fallback_analysis_keywords(subject: str, sender: str) -> Dict[str, Any]:
     """
     Original keyword-based placement analysis.
-    Used as fallback when LLM analysis fails.
+    Used to pre-filter emails before the LLM and as fallback when LLM analysis fails.
     
     Args:
         subject: Email subject line
@@ -66,20 +166,19 @@ def _fallback_analysis_keywords(subject: str, sender: str) -> Dict[str, Any]:
     """
     # Check sender patterns first (high confidence indicators)
     sender_lower = sender.lower()
+    subject_lower = subject.lower()
     is_placement = False
     
-    if any(indicator in sender_lower for indicator in ["placements", "cdc", "recruitment", "hr", "careers"]):
+    if _SENDER_RE.search(sender_lower):
         logger.info(f"Placement email detected by sender pattern: {sender}")
         is_placement = True
 
     # Check subject against keywords
     if not is_placement:
-        subject_lower = subject.lower()
-        for keyword in KEYWORDS:
-            if keyword.lower() in subject_lower:
-                logger.info(f"Placement email detected by keyword '{keyword}': {subject}")
-                is_placement = True
-                break
+        keyword_match = _KEYWORDS_RE.search(subject_lower)
+        if keyword_match:
+            logger.info(f"Placement email detected by keyword '{keyword_match.group()}': {subject}")
+            is_placement = True
 
     # Extract basic information
     company = "Unknown"
@@ -91,9 +190,8 @@ def _fallback_analysis_keywords(subject: str, sender: str) -> Dict[str, Any]:
             company = domain.split(".")[0].title()
     
     # Simple role extraction from subject
-    role_keywords = ["engineer", "developer", "analyst", "intern", "manager", "associate"]
-    for keyword in role_keywords:
-        if keyword in subject.lower():
+    for keyword in ROLE_KEYWORDS:
+        if keyword in subject_lower:
             role = keyword.title()
             break
     
@@ -105,5 +203,6 @@ def _fallback_analysis_keywords(subject: str, sender: str) -> Dict[str, Any]:
         'salary': None,
         'location': None,
         'type': None,
-        'requirements': None
+        'requirements': None,
+        'description': None
     }
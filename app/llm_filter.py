@@ -1,16 +1,29 @@
 """LLM-based email filtering using Google Gemini."""
 
+import asyncio
+import hashlib
 import logging
 import json
-from typing import Optional, Dict, Any
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from typing import Optional, Dict, Any, List, Tuple
 try:
     import google.genai as genai
+    from google.genai import types
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
+    types = None
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
 
-from app.config import GEMINI_API_KEY
+from app.config import GEMINI_API_KEY, LLM_CACHE_DIR
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -23,6 +36,9 @@ if GEMINI_AVAILABLE and genai:
         logger.error(f"Failed to configure Gemini: {e}")
         GEMINI_AVAILABLE = False
 
+# Gemini model used for placement analysis
+GEMINI_MODEL = 'gemini-2.0-flash-001'
+
 # Student profile template - can be expanded with more details
 STUDENT_PROFILE = {
     "name": "Akkilesh A",
@@ -33,42 +49,87 @@ STUDENT_PROFILE = {
     "specialization": "Computer Science & Engineering"
 }
 
-def build_placement_detection_prompt(
-    subject: str, 
-    sender: str, 
-    body: str = "", 
-    student_profile: Optional[Dict[str, Any]] = None
-) -> str:
-    """
-    Build a comprehensive prompt for placement email detection.
-    
-    Args:
-        subject: Email subject line
-        sender: Email sender address
-        body: Email body content (optional)
-        student_profile: Student information dictionary
-    
-    Returns:
-        Formatted prompt string
-    """
-    profile = student_profile or STUDENT_PROFILE
-    
-    # Build dynamic student info section
-    student_info = f"I'm {profile['name']}, currently pursuing my {profile['degree']} {profile['year']} at {profile['university']}, expected to graduate in {profile['graduation_year']}."
-    
-    # Add optional profile details if available
-    if profile.get("specialization"):
-        student_info += f" My specialization is {profile['specialization']}."
+# Structured-output schema for Gemini responses; replaces spelling out the
+# JSON format in the prompt and guarantees a parseable reply
+_RESPONSE_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'is_placement_related': {'type': 'BOOLEAN'},
+        'company': {
+            'type': 'STRING',
+            'description': "Company name if found, otherwise 'Unknown'"
+        },
+        'role': {
+            'type': 'STRING',
+            'description': "Job role/position if found, otherwise 'Position'"
+        },
+        'deadline': {
+            'type': 'STRING', 'nullable': True,
+            'description': 'Application deadline if mentioned, otherwise null'
+        },
+        'salary': {
+            'type': 'STRING', 'nullable': True,
+            'description': 'Salary/CTC if mentioned, otherwise null'
+        },
+        'location': {
+            'type': 'STRING', 'nullable': True,
+            'description': 'Job location if mentioned, otherwise null'
+        },
+        'type': {
+            'type': 'STRING', 'nullable': True,
+            'description': 'Full-time/Internship/Contract/etc if identifiable, otherwise null'
+        },
+        'requirements': {
+            'type': 'STRING', 'nullable': True,
+            'description': 'Key requirements mentioned, otherwise null'
+        },
+        'description': {
+            'type': 'STRING', 'nullable': True,
+            'description': 'Bullet-point summary of the email formatted as: • Point 1 • Point 2 • Point 3'
+        }
+    },
+    'required': [
+        'is_placement_related', 'company', 'role', 'deadline', 'salary',
+        'location', 'type', 'requirements', 'description'
+    ]
+}
 
-    prompt = f"""
-{student_info}
+# Schema for batched requests: one analysis per email, in order
+_BATCH_RESPONSE_SCHEMA = {'type': 'ARRAY', 'items': _RESPONSE_SCHEMA}
 
-I need you to analyze the following email and determine if it's related to placement opportunities, job offers, recruitment drives, internships, or career opportunities that would be relevant for a student like me.
+# Most async Gemini requests in flight at once, to stay within the per-minute quota
+GEMINI_MAX_CONCURRENCY = 5
+_GEMINI_SEMAPHORE = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
 
-EMAIL DETAILS:
-- Subject: "{subject}"
-- Sender: "{sender}"
-{f'- Body: "{body}"' if body else ""}
+# Prompt head for STUDENT_PROFILE and a digest identifying it, built on
+# first use and reset on profile updates
+_PROMPT_HEAD: Optional[str] = None
+_PROFILE_TOKEN: Optional[str] = None
+
+# LRU cache of successful LLM analyses for STUDENT_PROFILE, keyed on the
+# profile token and the normalized (subject, sender, body); cleared
+# whenever the profile changes
+RESULT_CACHE_SIZE = 1024
+_RESULT_CACHE: "OrderedDict[Tuple[str, str, str, str], Dict[str, Any]]" = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()  # The async path updates it from worker threads
+
+# Persistent copy of the result cache, shared across restarts and worker
+# processes when LLM_CACHE_DIR is set and diskcache is installed; keys
+# include the profile token, so a profile change never serves stale entries
+DISK_CACHE_EXPIRE = 24 * 60 * 60
+DISK_CACHE_SIZE_LIMIT = 2 ** 30
+_DISK_CACHE = None
+_DISK_CACHE_DISABLED = diskcache is None or not LLM_CACHE_DIR
+
+# Reply/forward prefixes stripped from subjects before caching, e.g. "Re: Fwd[2]:"
+_SUBJECT_PREFIX_RE = re.compile(r'^(?:\s*(?:re|fwd?|aw|wg)\s*(?:\[\d+\])?\s*:)+', re.IGNORECASE)
+
+
+# Static part of the placement detection prompt, filled in per student profile
+_PROMPT_HEAD_TEMPLATE = Template("""
+$student_info
+
+I need you to analyze the email provided by the user and determine if it's related to placement opportunities, job offers, recruitment drives, internships, or career opportunities that would be relevant for a student like me.
 
 ANALYSIS CRITERIA:
 Consider this email placement-related if it contains:
@@ -83,7 +144,7 @@ Consider this email placement-related if it contains:
 - Offer letters or joining instructions
 
  IMPORTANT NOTES:
- - Focus on opportunities suitable for my graduation year ({profile['graduation_year']})
+ - Focus on opportunities suitable for my graduation year ($graduation_year)
  - Consider both direct job offers and application opportunities
  - Include both full-time positions and internships
  - Consider emails from placement cells, HR departments, and recruiting companies
@@ -97,25 +158,163 @@ Consider this email placement-related if it contains:
  • Important links or instructions
  • Eligibility criteria or restrictions
  • Next steps or follow-up actions required
+""".strip())
+
+# Number of built per-email prompt parts kept around. Repeated emails are
+# normally answered from the result cache first, so this only needs to cover
+# immediate rebuilds; keeping it small bounds the email bodies held in memory
+PROMPT_CACHE_SIZE = 16
+
+# Per-email part of the prompt; the body line is only added when there is a body
+_EMAIL_DETAILS_TEMPLATE = Template("""
+$heading:
+- Subject: "$subject"
+- Sender: "$sender"
+""".strip())
+_EMAIL_BODY_TEMPLATE = Template('- Body: "$body"')
 
- RESPONSE FORMAT:
- Respond with a JSON object containing:
- {{
-   "is_placement_related": true/false,
-   "company": "Company name if found, otherwise 'Unknown'",
-   "role": "Job role/position if found, otherwise 'Position'", 
-   "deadline": "Application deadline if mentioned, otherwise null",
-   "salary": "Salary/CTC if mentioned, otherwise null",
-   "location": "Job location if mentioned, otherwise null",
-   "type": "Full-time/Internship/Contract/etc if identifiable, otherwise null",
-   "requirements": "Key requirements mentioned, otherwise null",
-   "description": "A clear bullet-point summary of the email content covering key dates, times, deadlines, requirements, links, and action items. Format as: • Point 1 • Point 2 • Point 3"
- }}
 
- Return only the JSON object, no other text.
-"""
+def _build_prompt_head(profile: Dict[str, Any]) -> str:
+    """
+    Build the static part of the placement detection prompt.
+    
+    Everything except the email itself lives here, so the same prefix is
+    sent for every email and can be cached. The response format is given
+    by _RESPONSE_SCHEMA rather than described in the prompt.
+    
+    Args:
+        profile: Student information dictionary
+    
+    Returns:
+        Prompt text preceding the email details
+    """
+    # Build dynamic student info section
+    student_info = f"I'm {profile['name']}, currently pursuing my {profile['degree']} {profile['year']} at {profile['university']}, expected to graduate in {profile['graduation_year']}."
+    
+    # Add optional profile details if available
+    if profile.get("specialization"):
+        student_info += f" My specialization is {profile['specialization']}."
+
+    return _PROMPT_HEAD_TEMPLATE.substitute(
+        student_info=student_info,
+        graduation_year=profile['graduation_year']
+    )
+
+
+def _get_prompt_head() -> str:
+    """Get the prompt head for the current student profile, building it once."""
+    global _PROMPT_HEAD
+    
+    if _PROMPT_HEAD is None:
+        _PROMPT_HEAD = _build_prompt_head(STUDENT_PROFILE)
+    return _PROMPT_HEAD
+
+
+def _get_profile_token() -> str:
+    """
+    Get a digest of the model and prompt head. Result cache keys carry it,
+    so an analysis made for an earlier student profile is never reused.
+    """
+    global _PROFILE_TOKEN
     
-    return prompt.strip()
+    if _PROFILE_TOKEN is None:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{GEMINI_MODEL}\x00{_get_prompt_head()}".encode('utf-8'))
+        _PROFILE_TOKEN = digest.hexdigest()
+    return _PROFILE_TOKEN
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _build_email_details(subject: str, sender: str, body: str = "", heading: str = "EMAIL DETAILS") -> str:
+    """Build the per-email part of the prompt; repeated emails reuse the built string."""
+    email_details = _EMAIL_DETAILS_TEMPLATE.substitute(heading=heading, subject=subject, sender=sender)
+    if body:
+        email_details += "\n" + _EMAIL_BODY_TEMPLATE.substitute(body=body)
+    
+    return email_details
+
+
+def _build_batch_email_details(emails: List[Tuple[str, str, str]]) -> str:
+    """Build the part of the prompt listing several emails for one batched request."""
+    sections = [
+        "Analyze each of the following emails independently. Respond with a JSON array "
+        "containing exactly one analysis per email, in the same order as the emails."
+    ]
+    for index, (subject, sender, body) in enumerate(emails, 1):
+        sections.append(_build_email_details(subject, sender, body, heading=f"EMAIL {index}"))
+    
+    return "\n\n".join(sections)
+
+
+def build_placement_detection_prompt(
+    subject: str, 
+    sender: str, 
+    body: str = "", 
+    student_profile: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a comprehensive prompt for placement email detection.
+    
+    Args:
+        subject: Email subject line
+        sender: Email sender address
+        body: Email body content (optional)
+        student_profile: Student information dictionary
+    
+    Returns:
+        Formatted prompt string
+    """
+    return _build_full_prompt(_build_email_details(subject, sender, body), student_profile)
+
+
+async def _generate_placement_analysis_async(
+    email_details: str,
+    response_schema: Dict[str, Any],
+    student_profile: Optional[Dict[str, Any]] = None
+):
+    """
+    Send the placement detection prompt for the given email details to Gemini.
+    
+    The prompt head goes in the system instruction, a stable prefix that
+    Gemini's implicit caching can reuse across requests. Requests go through
+    the client's async transport, so several of them can be in flight at
+    once over its shared connection pool, up to GEMINI_MAX_CONCURRENCY at a time.
+    
+    Args:
+        email_details: Per-email part of the prompt
+        response_schema: Schema the JSON response must match
+        student_profile: Student information dictionary
+    
+    Returns:
+        Gemini response object
+    """
+    async with _GEMINI_SEMAPHORE:
+        return await client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=[email_details],
+            config=_response_config(response_schema, system_instruction=_prompt_head_for(student_profile))
+        )
+
+
+def _build_full_prompt(email_details: str, student_profile: Optional[Dict[str, Any]] = None) -> str:
+    """Prefix the email details with the prompt head, as one prompt string."""
+    return f"{_prompt_head_for(student_profile)}\n\n{email_details}"
+
+
+def _prompt_head_for(student_profile: Optional[Dict[str, Any]] = None) -> str:
+    """Get the prompt head for the given profile, or the cached one for STUDENT_PROFILE."""
+    if student_profile is None:
+        return _get_prompt_head()
+    return _build_prompt_head(student_profile)
+
+
+def _response_config(response_schema: Dict[str, Any], system_instruction: Optional[str] = None):
+    """Build the request config asking Gemini for JSON matching the given schema."""
+    return types.GenerateContentConfig(
+        response_mime_type='application/json',
+        response_schema=response_schema,
+        system_instruction=system_instruction
+    )
 
 
 def analyze_placement_email_llm(
@@ -126,6 +325,29 @@ def analyze_placement_email_llm(
 ) -> Dict[str, Any]:
     """
     Use Google Gemini to analyze email and extract placement information.
+    Blocking wrapper around analyze_placement_email_llm_async for legacy
+    callers; it must not be called from a running event loop.
+    
+    Args:
+        subject: Email subject line
+        sender: Email sender address  
+        body: Email body content (optional)
+        student_profile: Student information dictionary
+        
+    Returns:
+        Dictionary containing placement analysis and extracted information
+    """
+    return asyncio.run(analyze_placement_email_llm_async(subject, sender, body, student_profile))
+
+
+async def analyze_placement_email_llm_async(
+    subject: str, 
+    sender: str, 
+    body: str = "", 
+    student_profile: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Use Google Gemini to analyze email and extract placement information.
     
     Args:
         subject: Email subject line
@@ -140,71 +362,301 @@ def analyze_placement_email_llm(
         if not GEMINI_AVAILABLE or not genai:
             logger.warning("Gemini not available, using fallback detection")
             return _fallback_placement_analysis(subject, sender)
-            
-        # Build the prompt
-        prompt = build_placement_detection_prompt(subject, sender, body, student_profile)
         
-        # Create the model
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-001',
-            contents=[prompt]
+        cache_key, cached_result = await _run_cache_io(
+            _lookup_analysis, subject, sender, body, student_profile
         )
-        
-                # Parse the response
-        result_text = response.text
-        if not result_text:
-            logger.warning("Empty response from Gemini")
-            return _fallback_placement_analysis(subject, sender)
-            
-        try:
-            # Clean and parse JSON response
-            result_text = result_text.strip()
-            if result_text.startswith('```json'):
-                result_text = result_text[7:]
-            if result_text.endswith('```'):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            result = json.loads(result_text)
-            
-            # Validate required fields
-            if 'is_placement_related' not in result:
-                logger.warning("Missing 'is_placement_related' field in LLM response")
-                return _fallback_placement_analysis(subject, sender)
-            
-            # Ensure all expected fields exist with defaults
-            expected_fields = {
-                'is_placement_related': False,
-                'company': 'Unknown',
-                'role': 'Position',
-                'deadline': None,
-                'salary': None,
-                'location': None,
-                'type': None,
-                'requirements': None,
-                'description': None
-            }
-            
-            for field, default in expected_fields.items():
-                if field not in result:
-                    result[field] = default
+        if cached_result is not None:
+            return cached_result
             
-            # Log for debugging
-            logger.info(f"LLM Analysis - Subject: '{subject[:50]}...', Company: '{result.get('company')}', Role: '{result.get('role')}', Placement: {result.get('is_placement_related')}")
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM JSON response: {e}")
-            logger.debug(f"Raw response: {result_text}")
-            return _fallback_placement_analysis(subject, sender)
+        response = await _generate_placement_analysis_async(
+            _build_email_details(subject, sender, body),
+            _RESPONSE_SCHEMA,
+            student_profile
+        )
         
-    except Exception as e:
-        logger.error(f"Error in LLM placement detection: {type(e).__name__} - {e}")
-        logger.info(f"Falling back to sender-based detection for: {subject}")
+        return await _run_cache_io(_parse_analysis, response, subject, sender, cache_key)
         
-        # Fallback to simple analysis
+    except Exception as e:
+        return _analysis_failed(e, subject, sender)
+
+
+def _lookup_analysis(
+    subject: str,
+    sender: str,
+    body: str,
+    student_profile: Optional[Dict[str, Any]]
+) -> Tuple[Optional[Tuple[str, str, str, str]], Optional[Dict[str, Any]]]:
+    """
+    Find a cached analysis for an email.
+    
+    Returns:
+        Tuple of the result cache key (None when the result must not be
+        cached) and the cached analysis, if there is one
+    """
+    # Re-surfaced messages and repeated bulk mail skip the network round-trip
+    if student_profile is not None:
+        return None, None
+    
+    cache_key = _result_cache_key((subject, sender, body))
+    cached_result = _get_cached_result(cache_key)
+    if cached_result is not None:
+        logger.info(f"Using cached LLM analysis for: '{subject[:50]}...'")
+    return cache_key, cached_result
+
+
+def _parse_analysis(
+    response,
+    subject: str,
+    sender: str,
+    cache_key: Optional[Tuple[str, str, str, str]] = None
+) -> Dict[str, Any]:
+    """Turn a single-email Gemini response into an analysis, caching it under cache_key."""
+    result_text = response.text
+    if not result_text:
+        logger.warning("Empty response from Gemini")
         return _fallback_placement_analysis(subject, sender)
+        
+    # Structured output mode guarantees a JSON object matching the schema
+    result = _complete_analysis(json.loads(result_text), subject)
+    
+    if cache_key is not None:
+        _cache_result(cache_key, result)
+    
+    return result
+
+
+def _analysis_failed(error: Exception, subject: str, sender: str) -> Dict[str, Any]:
+    """Log a failed LLM analysis and fall back to simple analysis."""
+    logger.error(f"Error in LLM placement detection: {type(error).__name__} - {error}")
+    logger.info(f"Falling back to sender-based detection for: {subject}")
+    
+    return _fallback_placement_analysis(subject, sender)
+
+
+async def analyze_placement_emails_llm_async(emails: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """
+    Analyze several emails with a single Gemini request.
+    
+    Emails with a cached analysis are not resent. If the batched request
+    fails or returns the wrong number of analyses, the remaining emails
+    are analyzed with concurrent requests instead.
+    
+    Args:
+        emails: List of (subject, sender, body) tuples
+        
+    Returns:
+        List of analysis dictionaries, in the same order as emails
+    """
+    if not GEMINI_AVAILABLE or not genai:
+        logger.warning("Gemini not available, using fallback detection")
+        return [_fallback_placement_analysis(subject, sender) for subject, sender, _ in emails]
+    
+    cache_keys, results = await _run_cache_io(_get_cached_results, emails)
+    pending = [index for index, result in enumerate(results) if result is None]
+    
+    if len(pending) > 1:
+        try:
+            response = await _generate_placement_analysis_async(
+                _build_batch_email_details([emails[index] for index in pending]),
+                _BATCH_RESPONSE_SCHEMA
+            )
+            await _run_cache_io(_apply_batch_analysis, response, emails, cache_keys, pending, results)
+            pending = []
+            
+        except Exception as e:
+            logger.error(f"Batched LLM analysis failed, analyzing emails concurrently: {type(e).__name__} - {e}")
+    
+    pending_results = await asyncio.gather(
+        *(analyze_placement_email_llm_async(*emails[index]) for index in pending)
+    )
+    for index, result in zip(pending, pending_results):
+        results[index] = result
+    
+    return results
+
+
+def _apply_batch_analysis(
+    response,
+    emails: List[Tuple[str, str, str]],
+    cache_keys: List[Tuple[str, str, str, str]],
+    pending: List[int],
+    results: List[Optional[Dict[str, Any]]]
+) -> None:
+    """
+    Store the analyses from a batched Gemini response into results.
+    
+    Raises:
+        ValueError: If the response has a different number of analyses
+            than there are pending emails
+    """
+    batch_results = json.loads(response.text or "[]")
+    if len(batch_results) != len(pending):
+        raise ValueError(f"expected {len(pending)} analyses, got {len(batch_results)}")
+    
+    for index, result in zip(pending, batch_results):
+        results[index] = _complete_analysis(result, emails[index][0])
+        _cache_result(cache_keys[index], results[index])
+
+
+def _complete_analysis(result: Dict[str, Any], subject: str) -> Dict[str, Any]:
+    """Fill in defaults for any fields missing from an LLM analysis and log it."""
+    # Ensure all expected fields exist with defaults
+    expected_fields = {
+        'is_placement_related': False,
+        'company': 'Unknown',
+        'role': 'Position',
+        'deadline': None,
+        'salary': None,
+        'location': None,
+        'type': None,
+        'requirements': None,
+        'description': None
+    }
+    
+    for field, default in expected_fields.items():
+        if field not in result:
+            result[field] = default
+    
+    # Log for debugging
+    logger.info(f"LLM Analysis - Subject: '{subject[:50]}...', Company: '{result.get('company')}', Role: '{result.get('role')}', Placement: {result.get('is_placement_related')}")
+    
+    return result
+
+
+async def _run_cache_io(func, *args):
+    """
+    Call a result cache helper from the event loop. When the disk cache is
+    enabled the call runs in a worker thread, so SQLite I/O never blocks the loop.
+    """
+    if _DISK_CACHE_DISABLED:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+def _get_cached_results(
+    emails: List[Tuple[str, str, str]]
+) -> Tuple[List[Tuple[str, str, str, str]], List[Optional[Dict[str, Any]]]]:
+    """
+    Look up the cached analysis of each email.
+    
+    Returns:
+        Tuple of the result cache key of each email and its cached
+        analysis, None where there is none
+    """
+    cache_keys = [_result_cache_key(email) for email in emails]
+    return cache_keys, [_get_cached_result(key) for key in cache_keys]
+
+
+def _get_cached_result(key: Tuple[str, str, str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached LLM analysis, marking it as recently used.
+    Falls back to the disk cache, keeping any hit in memory as well.
+    """
+    with _RESULT_CACHE_LOCK:
+        result = _RESULT_CACHE.get(key)
+        if result is not None:
+            _RESULT_CACHE.move_to_end(key)
+            return dict(result)
+    
+    result = _disk_cache_get(key)
+    if result is None:
+        return None
+    _remember_result(key, result)
+    return dict(result)
+
+
+def _cache_result(key: Tuple[str, str, str, str], result: Dict[str, Any]) -> None:
+    """
+    Cache an LLM analysis, evicting the least recently used entry when full.
+    Nothing is stored if the student profile changed since the key was made,
+    as the analysis then reflects the old profile.
+    """
+    if key[0] != _get_profile_token():
+        logger.debug("Student profile changed during LLM analysis, not caching the result")
+        return
+    
+    _remember_result(key, dict(result))
+    _disk_cache_set(key, result)
+
+
+def _remember_result(key: Tuple[str, str, str, str], result: Dict[str, Any]) -> None:
+    """Put an analysis in the in-memory LRU cache under a normalized key."""
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[key] = result
+        _RESULT_CACHE.move_to_end(key)
+        if len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+
+def _get_disk_cache():
+    """Get the persistent result cache, opening it on first use, or None if it is unavailable."""
+    global _DISK_CACHE, _DISK_CACHE_DISABLED
+    
+    if _DISK_CACHE is None and not _DISK_CACHE_DISABLED:
+        try:
+            _DISK_CACHE = diskcache.Cache(LLM_CACHE_DIR, size_limit=DISK_CACHE_SIZE_LIMIT)
+        except Exception as e:
+            logger.warning(f"LLM disk cache unavailable at {LLM_CACHE_DIR}: {type(e).__name__} - {e}")
+            _DISK_CACHE_DISABLED = True
+    
+    return _DISK_CACHE
+
+
+def _disk_cache_key(key: Tuple[str, str, str, str]) -> str:
+    """
+    Hash a result cache key. Its profile token stands for the model and
+    prompt head as they were at lookup time, not when the result is stored.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in key:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def _disk_cache_get(key: Tuple[str, str, str, str]) -> Optional[Dict[str, Any]]:
+    """Look up a normalized key in the disk cache; errors count as a miss."""
+    cache = _get_disk_cache()
+    if cache is None:
+        return None
+    
+    try:
+        return cache.get(_disk_cache_key(key))
+    except Exception as e:
+        logger.debug(f"LLM disk cache read failed: {type(e).__name__} - {e}")
+        return None
+
+
+def _disk_cache_set(key: Tuple[str, str, str, str], result: Dict[str, Any]) -> None:
+    """Store an analysis in the disk cache; failures only cost a future LLM call."""
+    cache = _get_disk_cache()
+    if cache is None:
+        return
+    
+    try:
+        cache.set(_disk_cache_key(key), dict(result), expire=DISK_CACHE_EXPIRE)
+    except Exception as e:
+        logger.debug(f"LLM disk cache write failed: {type(e).__name__} - {e}")
+
+
+def _result_cache_key(email: Tuple[str, str, str]) -> Tuple[str, str, str, str]:
+    """
+    Build the result cache key of a (subject, sender, body) email: the
+    current profile token followed by the normalized email fields, so that
+    reminders, replies and forwards of an already analyzed email share its entry.
+    
+    Reply/forward prefixes are stripped from the subject, and case and
+    whitespace differences are ignored in all three fields.
+    """
+    subject, sender, body = email
+    subject = _SUBJECT_PREFIX_RE.sub('', subject)
+    return (
+        _get_profile_token(),
+        ' '.join(subject.split()).casefold(),
+        sender.strip().casefold(),
+        ' '.join(body.split()).casefold(),
+    )
 
 
 def _fallback_placement_analysis(subject: str, sender: str) -> Dict[str, Any]:
@@ -273,7 +725,7 @@ def update_student_profile(**kwargs) -> Dict[str, Any]:
     Returns:
         Updated student profile dictionary
     """
-    global STUDENT_PROFILE
+    global STUDENT_PROFILE, _PROMPT_HEAD, _PROFILE_TOKEN
     
     for key, value in kwargs.items():
         if key in STUDENT_PROFILE:
@@ -282,6 +734,12 @@ def update_student_profile(**kwargs) -> Dict[str, Any]:
         else:
             logger.warning(f"Unknown profile field: {key}")
     
+    # The cached prompt head and analyses depend on the profile, so rebuild them
+    _PROMPT_HEAD = None
+    _PROFILE_TOKEN = None
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE.clear()
+    
     return STUDENT_PROFILE.copy()
 
 
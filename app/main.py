@@ -2,10 +2,15 @@
 
 from contextlib import asynccontextmanager
 import asyncio
+import logging
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from app.email_listener import check_for_new_emails
+from app.email_listener import check_for_new_emails, close_mailbox, wait_for_new_emails
 from app.llm_filter import update_student_profile, get_student_profile
+from app.notifier.whatsapp import close_async_client
+
+# Send log records from all app modules to stderr once, at startup
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 
 @asynccontextmanager
@@ -14,14 +19,19 @@ async def lifespan(app: FastAPI):
     task = asyncio.create_task(poll_email_loop())
     yield
     task.cancel()
+    close_mailbox()
+    await close_async_client()
 
 
 async def poll_email_loop():
-    """Infinite loop to periodically check for new emails."""
+    """Infinite loop to check for new emails whenever the server reports new mail."""
     while True:
         print("🔁 Checking for new placement emails...")
-        await asyncio.to_thread(check_for_new_emails)
-        await asyncio.sleep(60)
+        await check_for_new_emails()
+        
+        # Sleep in IMAP IDLE until mail arrives; poll every minute if IDLE is unavailable
+        if not await asyncio.to_thread(wait_for_new_emails):
+            await asyncio.sleep(60)
 
 
 app = FastAPI(lifespan=lifespan)
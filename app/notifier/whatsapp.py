@@ -1,13 +1,146 @@
 """Sends WhatsApp alerts via Twilio."""
 
-from typing import Optional
-from twilio.rest import Client
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+import httpx
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from app.config import (
     TWILIO_ACCOUNT_SID,
     TWILIO_AUTH_TOKEN,
     TO_WHATSAPP,
+    TWILIO_MPS,
 )
 
+if TYPE_CHECKING:
+    from twilio.rest import Client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Kept-alive connections to the Twilio API, enough for a few concurrent sends
+TWILIO_POOL_SIZE = 4
+
+# Seconds to wait on the Twilio API before giving up on a send
+TWILIO_TIMEOUT = 10
+
+# Attempts per alert, including the first, when Twilio fails transiently
+SEND_ATTEMPTS = 3
+
+# httpx failures raised before Twilio could have received the request, so a
+# retry cannot deliver the same alert twice
+_RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class _TokenBucket:
+    """
+    Token bucket pacing sends to a steady rate per second.
+    Each caller reserves a token up front and then waits for its turn, so
+    the bucket can be shared by threads and the event loop alike.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Block until a send is allowed."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a send is allowed."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _create_client() -> "Client":
+    """Create a Twilio client whose HTTP session pools connections to the API host."""
+    # The Twilio SDK is slow to import and only the sync sender needs it
+    from requests.adapters import HTTPAdapter
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+    
+    http_client = TwilioHttpClient(timeout=TWILIO_TIMEOUT)
+    http_client.session.mount(
+        "https://", HTTPAdapter(pool_connections=1, pool_maxsize=TWILIO_POOL_SIZE)
+    )
+    return Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+
+
+# Shared Twilio client, created on first send; its HTTP session keeps
+# connections to the API alive
+_TWILIO: Optional["Client"] = None
+
+# Paces sends below Twilio's rate limit instead of running into 429 responses
+_RATE_LIMITER = _TokenBucket(TWILIO_MPS)
+
+# Twilio WhatsApp sandbox number alerts are sent from
+FROM_WHATSAPP = "whatsapp:+14155238886"
+
+# Longest WhatsApp message body Twilio accepts, in characters as Twilio
+# counts them: UTF-16 code units, so most emoji count twice
+MAX_MESSAGE_LENGTH = 1600
+
+# Per-field budgets that keep a typical alert under MAX_MESSAGE_LENGTH
+# without losing the subject and footer to the final cut
+DESCRIPTION_MAX_LENGTH = 800
+REQUIREMENTS_MAX_LENGTH = 100
+SUBJECT_MAX_LENGTH = 60
+
+# Layout of a placement alert. Optional fields are substituted as whole
+# lines from _OPTIONAL_LINES, or left out entirely when they are empty.
+_MESSAGE_TEMPLATE = (
+    "🚨 *Placement Alert!*\n\n"
+    "🏢 *Company:* {company}\n"
+    "💼 *Role:* {role}\n"
+    "{job_type}{location}{salary}{deadline}"
+    "{requirements}{description}{attachment_info}"
+    "\n📧 *Subject:* {subject}\n"
+    "\n📬 Check your inbox for full details!"
+)
+
+# Line formats for the optional fields; the later sections start with a blank line
+_OPTIONAL_LINES = {
+    'job_type': "📋 *Type:* {}\n",
+    'location': "📍 *Location:* {}\n",
+    'salary': "💰 *Salary:* {}\n",
+    'deadline': "⏰ *Deadline:* {}\n",
+    'requirements': "\n✅ *Requirements:* {}\n",
+    'description': "\n📝 *Summary:*\n{}\n",
+    'attachment_info': "\n📎 *Attachments:*\n{}\n",
+}
+
+
+class _MessageFields(dict):
+    """Fields for _MESSAGE_TEMPLATE; optional lines that were not filled in render as empty."""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+# REST endpoint used by the async sender, which bypasses the Twilio SDK
+_MESSAGES_URL = f"https://api.twilio.com/2010-04-01/Accounts/{TWILIO_ACCOUNT_SID}/Messages.json"
+
+# Async HTTP client for concurrent sends, created on first use inside the event loop
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+
 
 def send_whatsapp_placement_alert(
     subject: str, 
@@ -26,48 +159,220 @@ def send_whatsapp_placement_alert(
     All extracted details are included for maximum usefulness.
     """
     try:
-        # Build comprehensive message with all available information
-        message_body = f"🚨 *Placement Alert!*\n\n"
-        message_body += f"🏢 *Company:* {company}\n"
-        message_body += f"💼 *Role:* {role}\n"
-        
-        if job_type:
-            message_body += f"📋 *Type:* {job_type}\n"
-        
-        if location:
-            message_body += f"📍 *Location:* {location}\n"
-            
-        if salary:
-            message_body += f"💰 *Salary:* {salary}\n"
-            
-        if deadline:
-            message_body += f"⏰ *Deadline:* {deadline}\n"
-        
-        # Add spacing before requirements section
-        if requirements:
-            # Truncate requirements if too long
-            req_text = requirements[:100] + "..." if len(requirements) > 100 else requirements
-            message_body += f"\n✅ *Requirements:* {req_text}\n"
-        
-        # Add spacing before summary section
-        if description:
-            message_body += f"\n📝 *Summary:*\n{description}\n"
-        
-        # Add spacing before attachment section
-        if attachment_info:
-            message_body += f"\n📎 *Attachments:*\n{attachment_info}\n"
-        
-        # Add spacing before subject and final message
-        message_body += f"\n📧 *Subject:* {subject[:60]}{'...' if len(subject) > 60 else ''}\n"
-        message_body += f"\n📬 Check your inbox for full details!"
-
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        message = client.messages.create(
-            from_="whatsapp:+14155238886",
+        message_body = _build_message_body(
+            subject, company, role, deadline, salary, location,
+            job_type, requirements, description, attachment_info
+        )
+
+        message = _send_message(message_body)
+        logger.info("📲 WhatsApp message sent: SID %s", message.sid)
+
+    except Exception as e:
+        _log_send_failure(e)
+
+
+async def send_whatsapp_placement_alert_async(
+    subject: str, 
+    company: str, 
+    role: str,
+    deadline: Optional[str] = None,
+    salary: Optional[str] = None,
+    location: Optional[str] = None,
+    job_type: Optional[str] = None,
+    requirements: Optional[str] = None,
+    description: Optional[str] = None,
+    attachment_info: Optional[str] = None
+) -> None:
+    """
+    Async version of send_whatsapp_placement_alert.
+    Posts straight to the Twilio REST API over a shared async HTTP client,
+    so alerts for several emails can be sent concurrently.
+    """
+    try:
+        message_body = _build_message_body(
+            subject, company, role, deadline, salary, location,
+            job_type, requirements, description, attachment_info
+        )
+
+        response = await _post_message(message_body)
+        logger.info("📲 WhatsApp message sent: SID %s", response.json()['sid'])
+
+    except Exception as e:
+        _log_send_failure(e)
+
+
+async def close_async_client() -> None:
+    """Close the shared async HTTP client, if one was created."""
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+
+def _log_send_failure(error: Exception) -> None:
+    """
+    Log a failed send. Twilio errors render the whole request when turned
+    into text, so the details are only formatted when debug logging is on.
+    """
+    logger.error("❌ Failed to send WhatsApp message: %s", type(error).__name__)
+    logger.debug("WhatsApp send failure details", exc_info=error)
+
+
+def _build_message_body(
+    subject: str, 
+    company: str, 
+    role: str,
+    deadline: Optional[str] = None,
+    salary: Optional[str] = None,
+    location: Optional[str] = None,
+    job_type: Optional[str] = None,
+    requirements: Optional[str] = None,
+    description: Optional[str] = None,
+    attachment_info: Optional[str] = None
+) -> str:
+    """Build the WhatsApp message text for a placement alert."""
+    # Fill in every available field with one pass over the template
+    optional_values = {
+        'job_type': job_type,
+        'location': location,
+        'salary': salary,
+        'deadline': deadline,
+        'requirements': requirements and _clip(requirements, REQUIREMENTS_MAX_LENGTH),
+        'description': description and _clip(description, DESCRIPTION_MAX_LENGTH),
+        'attachment_info': attachment_info,
+    }
+    fields = _MessageFields(
+        (key, _OPTIONAL_LINES[key].format(value))
+        for key, value in optional_values.items() if value
+    )
+    fields.update(company=company, role=role, subject=_clip(subject, SUBJECT_MAX_LENGTH))
+    
+    message_body = _MESSAGE_TEMPLATE.format_map(fields)
+    
+    # Twilio rejects longer bodies outright, so cut here rather than fail the send
+    return _clip(message_body, MAX_MESSAGE_LENGTH, marker="…")
+
+
+def _clip(text: str, limit: int, marker: str = "...") -> str:
+    """
+    Truncate text to at most limit UTF-16 code units, the unit Twilio
+    measures message length in, ending it with marker when it is cut.
+    A cut never splits an emoji's surrogate pair.
+    """
+    encoded = text.encode('utf-16-le')
+    if len(encoded) <= 2 * limit:
+        return text
+    
+    keep = 2 * limit - len(marker.encode('utf-16-le'))
+    return encoded[:keep].decode('utf-16-le', 'ignore') + marker
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client for the Twilio API, creating it on first use."""
+    global _ASYNC_CLIENT
+
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
+            limits=httpx.Limits(max_connections=10),
+            timeout=TWILIO_TIMEOUT,
+        )
+    return _ASYNC_CLIENT
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Retry connection failures, rate limiting and server errors, but not other client errors."""
+    if isinstance(error, _RETRYABLE_TRANSPORT_ERRORS):
+        return True
+    
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    else:
+        # Only the sync sender raises requests and Twilio errors; checking the
+        # module first avoids loading either library for any other error
+        module = type(error).__module__
+        if module.startswith("requests."):
+            return _is_requests_connect_failure(error)
+        if not module.startswith("twilio."):
+            return False
+        from twilio.base.exceptions import TwilioRestException
+        if not isinstance(error, TwilioRestException):
+            return False
+        status = error.status
+    
+    return status == 429 or status >= 500
+
+
+def _is_requests_connect_failure(error: BaseException) -> bool:
+    """
+    Check whether a requests error was raised before the request was sent,
+    matching _RETRYABLE_TRANSPORT_ERRORS on the httpx side. A connection
+    aborted mid-request may already have delivered the alert, so it is not retried.
+    """
+    from requests.exceptions import ConnectionError as RequestsConnectionError, ConnectTimeout
+    from urllib3.exceptions import NewConnectionError
+    
+    if isinstance(error, ConnectTimeout):
+        return True
+    if not isinstance(error, RequestsConnectionError) or not error.args:
+        return False
+    # Failed connects arrive wrapped in urllib3's MaxRetryError
+    return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+
+
+# Retry policy for transient send failures: up to SEND_ATTEMPTS tries with
+# jittered exponential backoff, re-raising the last error if all of them fail
+_RETRY_SEND = retry(
+    retry=retry_if_exception(_is_retryable),
+    stop=stop_after_attempt(SEND_ATTEMPTS),
+    wait=wait_exponential_jitter(initial=0.2, max=2.0),
+    reraise=True,
+)
+
+
+@_RETRY_SEND
+def _send_message(message_body: str):
+    """Send a WhatsApp message body through the shared Twilio client."""
+    # Loaded here with the Twilio SDK, which is built on requests
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+    
+    _RATE_LIMITER.acquire()
+    try:
+        return _get_client().messages.create(
+            from_=FROM_WHATSAPP,
             body=message_body,
             to=f"whatsapp:{TO_WHATSAPP}",
         )
-        print(f"📲 WhatsApp message sent: SID {message.sid}")
+    except RequestsConnectionError:
+        # Pooled connection went stale or could not be made; any retry and
+        # later sends use a fresh client
+        _reset_client()
+        raise
 
-    except Exception as e:
-        print(f"❌ Failed to send WhatsApp message: {type(e).__name__} - {e}")
+
+@_RETRY_SEND
+async def _post_message(message_body: str) -> httpx.Response:
+    """Post a WhatsApp message body to the Twilio REST API through the shared async client."""
+    await _RATE_LIMITER.acquire_async()
+    response = await _get_async_client().post(
+        _MESSAGES_URL,
+        data={"From": FROM_WHATSAPP, "To": f"whatsapp:{TO_WHATSAPP}", "Body": message_body},
+    )
+    response.raise_for_status()
+    return response
+
+
+def _get_client() -> "Client":
+    """Return the shared Twilio client, creating it on first use."""
+    global _TWILIO
+    
+    if _TWILIO is None:
+        _TWILIO = _create_client()
+    return _TWILIO
+
+
+def _reset_client() -> None:
+    """Replace the shared Twilio client with a new one."""
+    global _TWILIO
+    _TWILIO = _create_client()
@@ -4,126 +4,159 @@ Test script for LLM-based email filtering.
 Run this to verify the Gemini integration works before deploying.
 """
 
+import asyncio
+import io
 import os
 import sys
-from dotenv import load_dotenv
+from contextlib import redirect_stdout
+from types import MappingProxyType
 
-# Load environment variables
-load_dotenv()
+# Always call Gemini: a verdict cached on disk by an earlier run would hide a
+# broken key or exhausted quota. Set before app.config loads .env, which
+# does not override variables that are already set.
+os.environ["LLM_CACHE_DIR"] = ""
 
-# Add app directory to path
-sys.path.append('app')
+# Importing the app loads .env once, in app.config
+from app.llm_filter import analyze_placement_email_llm_async, build_placement_detection_prompt
+
+# Sample placement-related emails, built once and read-only
+_PLACEMENT_FIXTURES = tuple(MappingProxyType(email) for email in (
+    {
+        "subject": "Google Software Engineer Internship 2026 - Applications Open",
+        "sender": "careers@google.com",
+        "body": "Dear Students, Google is hiring software engineering interns for summer 2026. Apply by March 15th. Requirements: Strong programming skills in Python/Java."
+    },
+    {
+        "subject": "Microsoft Campus Recruitment Drive - VIT Chennai",
+        "sender": "placements@vit.ac.in", 
+        "body": "Microsoft will be conducting campus recruitment for 2026 graduates. Eligibility: BTech/MTech with CGPA > 7.0. Register by Feb 20th."
+    },
+    {
+        "subject": "TCS CodeVita Contest - Win Job Offers",
+        "sender": "hr@tcs.com",
+        "body": "Participate in TCS CodeVita and get direct interview calls. Contest dates: March 1-15. Open for 2026 graduates."
+    },
+    {
+        "subject": "Infosys InfyTQ Certification Program",
+        "sender": "infytq@infosys.com",
+        "body": "Get certified and fast-track your career with Infosys. Course completion leads to job opportunities."
+    }
+))
+
+# Sample non-placement emails, built once and read-only
+_NON_PLACEMENT_FIXTURES = tuple(MappingProxyType(email) for email in (
+    {
+        "subject": "VIT Chennai Fee Payment Reminder",
+        "sender": "accounts@vit.ac.in",
+        "body": "Your semester fee payment is due by March 31st. Please complete payment to avoid late fees."
+    },
+    {
+        "subject": "Weekend Sale - Up to 70% Off",
+        "sender": "sales@amazon.com", 
+        "body": "Don't miss our weekend sale! Get amazing discounts on electronics, clothing and more."
+    },
+    {
+        "subject": "Your GitHub Security Alert",
+        "sender": "noreply@github.com",
+        "body": "We detected unusual activity in your GitHub account. Please review and secure your account."
+    },
+    {
+        "subject": "Class Schedule Update - Data Structures",
+        "sender": "faculty@vit.ac.in",
+        "body": "Data Structures class on Friday has been moved to 2 PM. Please update your schedules accordingly."
+    }
+))
+
+# Pass/fail labels indexed by the detected is_placement_related value
+_STATUS_EXPECT_PLACEMENT = ("❌ FAIL", "✅ PASS")
+_STATUS_EXPECT_NON_PLACEMENT = ("✅ PASS", "❌ FAIL")
+
+_COMPANY_LINE = "   Company: %s, Role: %s"
 
-from app.llm_filter import analyze_placement_email_llm, build_placement_detection_prompt
 
 def test_sample_emails():
     """Test the LLM filter with sample placement and non-placement emails."""
-    
-    # Sample placement-related emails
-    placement_emails = [
-        {
-            "subject": "Google Software Engineer Internship 2026 - Applications Open",
-            "sender": "careers@google.com",
-            "body": "Dear Students, Google is hiring software engineering interns for summer 2026. Apply by March 15th. Requirements: Strong programming skills in Python/Java."
-        },
-        {
-            "subject": "Microsoft Campus Recruitment Drive - VIT Chennai",
-            "sender": "placements@vit.ac.in", 
-            "body": "Microsoft will be conducting campus recruitment for 2026 graduates. Eligibility: BTech/MTech with CGPA > 7.0. Register by Feb 20th."
-        },
-        {
-            "subject": "TCS CodeVita Contest - Win Job Offers",
-            "sender": "hr@tcs.com",
-            "body": "Participate in TCS CodeVita and get direct interview calls. Contest dates: March 1-15. Open for 2026 graduates."
-        },
-        {
-            "subject": "Infosys InfyTQ Certification Program",
-            "sender": "infytq@infosys.com",
-            "body": "Get certified and fast-track your career with Infosys. Course completion leads to job opportunities."
-        }
-    ]
-    
-    # Sample non-placement emails
-    non_placement_emails = [
-        {
-            "subject": "VIT Chennai Fee Payment Reminder",
-            "sender": "accounts@vit.ac.in",
-            "body": "Your semester fee payment is due by March 31st. Please complete payment to avoid late fees."
-        },
-        {
-            "subject": "Weekend Sale - Up to 70% Off",
-            "sender": "sales@amazon.com", 
-            "body": "Don't miss our weekend sale! Get amazing discounts on electronics, clothing and more."
-        },
-        {
-            "subject": "Your GitHub Security Alert",
-            "sender": "noreply@github.com",
-            "body": "We detected unusual activity in your GitHub account. Please review and secure your account."
-        },
-        {
-            "subject": "Class Schedule Update - Data Structures",
-            "sender": "faculty@vit.ac.in",
-            "body": "Data Structures class on Friday has been moved to 2 PM. Please update your schedules accordingly."
-        }
-    ]
-    
     print("🧪 Testing LLM-based Email Filtering\n")
     print("=" * 60)
     
-    # Test placement emails
-    print("\n📧 TESTING PLACEMENT EMAILS (should return True):")
-    print("-" * 50)
-    
-    for i, email in enumerate(placement_emails, 1):
-        print(f"\n{i}. Subject: {email['subject'][:50]}...")
-        print(f"   Sender: {email['sender']}")
+    # Analyze all sample emails concurrently rather than one request at a time
+    placement_results, non_placement_results = asyncio.run(
+        _analyze_sample_emails(_PLACEMENT_FIXTURES, _NON_PLACEMENT_FIXTURES)
+    )
+    
+    # Every result is already in, so build the report in memory and write it
+    # out at once rather than making a terminal write for every line
+    with redirect_stdout(io.StringIO()) as report:
+        # Test placement emails
+        print("\n📧 TESTING PLACEMENT EMAILS (should return True):")
+        print("-" * 50)
+    
+        for i, (email, result) in enumerate(zip(_PLACEMENT_FIXTURES, placement_results), 1):
+            print(f"\n{i}. Subject: {email['subject'][:50]}...")
+            print(f"   Sender: {email['sender']}")
         
-        try:
-            result = analyze_placement_email_llm(
-                email['subject'], 
-                email['sender'], 
-                email['body']
-            )
-            is_placement = result.get('is_placement_related', False)
-            company = result.get('company', 'Unknown')
-            role = result.get('role', 'Position')
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                is_placement = result.get('is_placement_related', False)
+                company = result.get('company', 'Unknown')
+                role = result.get('role', 'Position')
             
-            status = "✅ PASS" if is_placement else "❌ FAIL"
-            print(f"   Result: {is_placement} {status}")
-            if is_placement:
-                print(f"   Company: {company}, Role: {role}")
+                status = _STATUS_EXPECT_PLACEMENT[bool(is_placement)]
+                print(f"   Result: {is_placement} {status}")
+                if is_placement:
+                    print(_COMPANY_LINE % (company, role))
             
-        except Exception as e:
-            print(f"   ❌ ERROR: {e}")
+            except Exception as e:
+                print(f"   ❌ ERROR: {e}")
     
-    # Test non-placement emails
-    print("\n\n📪 TESTING NON-PLACEMENT EMAILS (should return False):")
-    print("-" * 50)
+        # Test non-placement emails
+        print("\n\n📪 TESTING NON-PLACEMENT EMAILS (should return False):")
+        print("-" * 50)
     
-    for i, email in enumerate(non_placement_emails, 1):
-        print(f"\n{i}. Subject: {email['subject'][:50]}...")
-        print(f"   Sender: {email['sender']}")
+        for i, (email, result) in enumerate(zip(_NON_PLACEMENT_FIXTURES, non_placement_results), 1):
+            print(f"\n{i}. Subject: {email['subject'][:50]}...")
+            print(f"   Sender: {email['sender']}")
         
-        try:
-            result = analyze_placement_email_llm(
-                email['subject'], 
-                email['sender'], 
-                email['body']
-            )
-            is_placement = result.get('is_placement_related', False)
-            company = result.get('company', 'Unknown')
-            role = result.get('role', 'Position')
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                is_placement = result.get('is_placement_related', False)
+                company = result.get('company', 'Unknown')
+                role = result.get('role', 'Position')
             
-            status = "✅ PASS" if not is_placement else "❌ FAIL"
-            print(f"   Result: {is_placement} {status}")
-            if is_placement:
-                print(f"   Company: {company}, Role: {role}")
+                status = _STATUS_EXPECT_NON_PLACEMENT[bool(is_placement)]
+                print(f"   Result: {is_placement} {status}")
+                if is_placement:
+                    print(_COMPANY_LINE % (company, role))
             
-        except Exception as e:
-            print(f"   ❌ ERROR: {e}")
+            except Exception as e:
+                print(f"   ❌ ERROR: {e}")
     
-    print("\n" + "=" * 60)
-    print("🏁 Test completed!")
+        print("\n" + "=" * 60)
+        print("🏁 Test completed!")
+    
+    sys.stdout.write(report.getvalue())
+    sys.stdout.flush()
+
+
+async def _analyze_sample_emails(*email_lists):
+    """Analyze every sample email concurrently, returning one result list per input list."""
+    results = await asyncio.gather(
+        *(
+            analyze_placement_email_llm_async(email['subject'], email['sender'], email['body'])
+            for emails in email_lists
+            for email in emails
+        ),
+        return_exceptions=True
+    )
+    
+    split_results = []
+    start = 0
+    for emails in email_lists:
+        split_results.append(results[start:start + len(emails)])
+        start += len(emails)
+    return split_results
 
 
 def test_prompt_generation():
@@ -163,20 +196,18 @@ def check_environment():
         "GEMINI_API_KEY"
     ]
     
-    missing_vars = []
+    # Check every variable against one snapshot of the environment
+    env = os.environ
+    missing_vars = [var for var in required_vars if not env.get(var)]
     
-    for var in required_vars:
-        value = os.getenv(var)
-        if value:
-            print(f"✅ {var}: Set")
-        else:
-            print(f"❌ {var}: Missing")
-            missing_vars.append(var)
+    print("\n".join(
+        f"❌ {var}: Missing" if var in missing_vars else f"✅ {var}: Set"
+        for var in required_vars
+    ))
     
     if missing_vars:
         print(f"\n⚠️  Please set these environment variables in your .env file:")
-        for var in missing_vars:
-            print(f"   - {var}")
+        print("\n".join(f"   - {var}" for var in missing_vars))
         return False
     else:
         print("\n✅ All environment variables are set!")